@@ -1,115 +1,221 @@
 import time
 
+import numpy as np
+
+# orjson serializes the telemetry dict (including numpy scalars) in C;
+# fall back to the stdlib encoder when it is not installed
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:
+    import json
+
+    def _dumps(obj):
+        return json.dumps(obj).encode()
+
 class TelemetryAggregator:
-    def __init__(self, battery_sim, motor_sim, temp_sim):
+    # Telemetry record layout (structure-of-arrays): each tick fills a
+    # preallocated record in place instead of building a fresh dict
+    _dtype = np.dtype([
+        ('timestamp', 'f8'),
+        ('uptime', 'f8'),
+
+        # Battery metrics
+        ('battery_level', 'f4'),
+        ('battery_voltage', 'f4'),
+        ('battery_current', 'f4'),
+        ('battery_temperature', 'f4'),
+        ('battery_charging', '?'),
+
+        # Motor metrics
+        ('speed', 'f4'),
+        ('target_speed', 'f4'),
+        ('motor_power', 'f4'),
+        ('motor_temperature', 'f4'),
+        ('motor_rpm', 'f4'),
+        ('motor_torque', 'f4'),
+        ('motor_efficiency', 'f4'),
+
+        # Temperature metrics
+        ('ambient_temperature', 'f4'),
+        ('controller_temperature', 'f4'),
+
+        # Calculated metrics
+        ('total_energy_consumed', 'f8'),  # Wh
+        ('total_distance', 'f8'),  # km
+        ('energy_efficiency', 'f8'),  # Wh/km
+        ('estimated_range', 'f8'),  # km
+
+        # System status
+        ('system_health', 'f4'),
+    ])
+
+    def __init__(self, battery_sim, motor_sim, temp_sim, history_size=256):
         """
         Aggregate telemetry from multiple simulator components
-        
+
         Args:
             battery_sim: BatterySimulator instance
             motor_sim: MotorSimulator instance
             temp_sim: TemperatureSimulator instance
+            history_size: Number of telemetry records kept in the ring buffer
         """
         self.battery_sim = battery_sim
         self.motor_sim = motor_sim
         self.temp_sim = temp_sim
-        
+
         self.start_time = time.time()
         self.total_energy = 0.0  # Wh
         self.total_distance = 0.0  # km
-        self.last_update = time.time()
-    
+
+        # Elapsed-time tracking uses the monotonic clock in integer
+        # nanoseconds: immune to NTP adjustments, no float allocation
+        self._last_update_ns = time.monotonic_ns()
+
+        # Preallocated current record plus a ring buffer of recent records
+        # for rolling statistics without Python-level lists
+        self._buf = np.zeros(1, dtype=self._dtype)
+
+        # Reusable output dict: allocated once with its final key set so
+        # steady-state ticks only overwrite values, never insert keys
+        self._out = dict.fromkeys(self._dtype.names, 0.0)
+
+        self._history = np.zeros(history_size, dtype=self._dtype)
+        self._history_index = 0
+        self._history_count = 0
+
     def get_aggregated_telemetry(self):
         """
         Get aggregated telemetry from all components
+
+        The returned dict is reused across calls; callers that retain it
+        past the next tick should take a copy().
         """
+        # Wall clock once for the reported timestamp; monotonic integer
+        # nanoseconds for the elapsed-time arithmetic
         now = time.time()
-        elapsed = now - self.last_update
-        self.last_update = now
-        
-        # Get individual component states
+        now_ns = time.monotonic_ns()
+        elapsed = (now_ns - self._last_update_ns) * 1e-9
+        self._last_update_ns = now_ns
+
+        # Get individual component states, unpacked into locals once so the
+        # code below never repeats a dict lookup per field
         battery_state = self.battery_sim.get_state()
         motor_state = self.motor_sim.get_state()
         temp_state = self.temp_sim.get_state()
-        
+
+        get = battery_state.get
+        bat_level, bat_voltage, bat_current, bat_temp, bat_charging = (
+            get('level', 0.0), get('voltage', 0.0), get('current', 0.0),
+            get('temperature', 0.0), get('charging', False))
+
+        get = motor_state.get
+        speed, target_speed, power, motor_temp, rpm, torque, efficiency = (
+            get('speed', 0.0), get('target_speed', 0.0), get('power', 0.0),
+            get('temperature', 0.0), get('rpm', 0.0), get('torque', 0.0),
+            get('efficiency', 0.0))
+
+        get = temp_state.get
+        ambient_temp, controller_temp = get('ambient', 0.0), get('controller', 0.0)
+
         # Calculate energy consumption
         if elapsed > 0:
             # Power (W) * time (h) = energy (Wh)
-            energy_delta = (motor_state['power'] * (elapsed / 3600.0))
+            energy_delta = (power * (elapsed / 3600.0))
             self.total_energy += energy_delta
-            
+
             # Speed (km/h) * time (h) = distance (km)
-            distance_delta = (motor_state['speed'] * (elapsed / 3600.0))
+            distance_delta = (speed * (elapsed / 3600.0))
             self.total_distance += distance_delta
-        
+
         # Calculate efficiency metrics
         wh_per_km = 0.0
         if self.total_distance > 0:
             wh_per_km = self.total_energy / self.total_distance
-        
+
         range_estimate = 0.0
         if wh_per_km > 0:
-            remaining_energy = (battery_state['level'] / 100.0) * battery_state['voltage'] * self.battery_sim.capacity
+            remaining_energy = (bat_level / 100.0) * bat_voltage * self.battery_sim.capacity
             range_estimate = remaining_energy / wh_per_km
-        
-        # Return aggregated telemetry
-        return {
-            "timestamp": now,
-            "uptime": now - self.start_time,
-            
-            # Battery metrics
-            "battery_level": battery_state['level'],
-            "battery_voltage": battery_state['voltage'],
-            "battery_current": battery_state['current'],
-            "battery_temperature": battery_state['temperature'],
-            "battery_charging": battery_state['charging'],
-            
-            # Motor metrics
-            "speed": motor_state['speed'],
-            "target_speed": motor_state['target_speed'],
-            "motor_power": motor_state['power'],
-            "motor_temperature": motor_state['temperature'],
-            "motor_rpm": motor_state['rpm'],
-            "motor_torque": motor_state['torque'],
-            "motor_efficiency": motor_state['efficiency'],
-            
-            # Temperature metrics
-            "ambient_temperature": temp_state['ambient'],
-            "controller_temperature": temp_state['controller'],
-            
-            # Calculated metrics
-            "total_energy_consumed": self.total_energy,  # Wh
-            "total_distance": self.total_distance,  # km
-            "energy_efficiency": wh_per_km,  # Wh/km
-            "estimated_range": range_estimate,  # km
-            
-            # System status
-            "system_health": self._calculate_health(battery_state, motor_state, temp_state)
-        }
-    
-    def _calculate_health(self, battery_state, motor_state, temp_state):
+
+        # Fill the preallocated record in place
+        rec = self._buf[0]
+        rec['timestamp'] = now
+        rec['uptime'] = now - self.start_time
+
+        # Battery metrics
+        rec['battery_level'] = bat_level
+        rec['battery_voltage'] = bat_voltage
+        rec['battery_current'] = bat_current
+        rec['battery_temperature'] = bat_temp
+        rec['battery_charging'] = bat_charging
+
+        # Motor metrics
+        rec['speed'] = speed
+        rec['target_speed'] = target_speed
+        rec['motor_power'] = power
+        rec['motor_temperature'] = motor_temp
+        rec['motor_rpm'] = rpm
+        rec['motor_torque'] = torque
+        rec['motor_efficiency'] = efficiency
+
+        # Temperature metrics
+        rec['ambient_temperature'] = ambient_temp
+        rec['controller_temperature'] = controller_temp
+
+        # Calculated metrics
+        rec['total_energy_consumed'] = self.total_energy  # Wh
+        rec['total_distance'] = self.total_distance  # km
+        rec['energy_efficiency'] = wh_per_km  # Wh/km
+        rec['estimated_range'] = range_estimate  # km
+
+        # System status
+        rec['system_health'] = self._calculate_health(bat_level, bat_temp,
+                                                      motor_temp, controller_temp)
+
+        # Record into the history ring buffer
+        self._history[self._history_index] = rec
+        self._history_index = (self._history_index + 1) % len(self._history)
+        self._history_count = min(self._history_count + 1, len(self._history))
+
+        # Emit a dict only at the API boundary, refreshing the reusable one
+        self._out.update(zip(self._dtype.names, rec.tolist()))
+        return self._out
+
+    def get_telemetry_json(self):
+        """
+        Get the current aggregated telemetry serialized as JSON bytes
+
+        Uses orjson when available, so MQTT/WebSocket publishers can send
+        the payload without touching the Python json encoder.
+        """
+        return _dumps(self.get_aggregated_telemetry())
+
+    def get_history(self):
+        """
+        Get the recorded telemetry history as a structured numpy array
+
+        Returns the most recent records (up to history_size), oldest first.
+        """
+        if self._history_count < len(self._history):
+            return self._history[:self._history_count]
+        return np.roll(self._history, -self._history_index, axis=0)
+
+    def _calculate_health(self, battery_level, battery_temp, motor_temp, controller_temp):
         """
         Calculate overall system health based on component states
-        
+
         Returns a value between 0 (critical) and 100 (perfect)
         """
-        # Start with perfect health
-        health = 100.0
-        
-        # Battery factors
-        if battery_state['level'] < 20.0:
-            health -= (20.0 - battery_state['level'])
-        
-        if battery_state['temperature'] > 40.0:
-            health -= (battery_state['temperature'] - 40.0) * 2.0
-        
-        # Motor factors
-        if motor_state['temperature'] > 60.0:
-            health -= (motor_state['temperature'] - 60.0) * 1.5
-        
-        # Controller factors
-        if temp_state['controller'] > 70.0:
-            health -= (temp_state['controller'] - 70.0) * 1.5
-        
+        # Branchless form: each term is a weighted deficit beyond its
+        # threshold, clamped at zero, so there is no per-factor control flow
+        health = (100.0
+                  - max(0.0, 20.0 - battery_level)          # Battery charge
+                  - max(0.0, battery_temp - 40.0) * 2.0     # Battery temperature
+                  - max(0.0, motor_temp - 60.0) * 1.5       # Motor temperature
+                  - max(0.0, controller_temp - 70.0) * 1.5)  # Controller temperature
+
         # Ensure health is within bounds
         return max(0.0, min(100.0, health))
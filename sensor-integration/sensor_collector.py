@@ -12,6 +12,7 @@ import json
 import uuid
 import logging
 import argparse
+import asyncio
 from typing import Dict, Any, Optional
 
 # BME680 sensor library
@@ -21,8 +22,9 @@ except ImportError:
     # For testing without actual hardware
     from simulator.bme680_simulator import BME680Simulator as bme680
 
-# Neo4j connection
-from py2neo import Graph, Node, Relationship
+# Neo4j connection (official async driver: pooled bolt sessions, native
+# parameter serialization, writes overlap with sampling)
+from neo4j import AsyncGraphDatabase
 
 # Configure logging
 logging.basicConfig(
@@ -40,24 +42,43 @@ class SensorCollector:
     Collects data from BME680 sensor and stores it in Neo4j
     '''
     def __init__(self, neo4j_uri: str, neo4j_user: str, neo4j_password: str,
-                 collection_interval: int = 10, mock: bool = False):
+                 collection_interval: int = 10, batch_size: int = 50, mock: bool = False):
         '''
         Initialize sensor collector
-        
+
         Args:
             neo4j_uri: URI for Neo4j connection
             neo4j_user: Neo4j username
             neo4j_password: Neo4j password
             collection_interval: Data collection interval in seconds
+            batch_size: Number of readings to buffer before writing to Neo4j
             mock: Use simulated data instead of real sensor
         '''
         self.collection_interval = collection_interval
         self.mock = mock
-        
-        # Initialize Neo4j connection
-        self.graph = Graph(neo4j_uri, auth=(neo4j_user, neo4j_password))
+
+        # Buffer readings so Neo4j writes happen once per batch instead of
+        # once per reading (one transaction/fsync per batch)
+        self._buffer = []
+        self._batch_size = batch_size
+
+        # Constant parameterized insert query, built once: the server caches
+        # its query plan by text identity, and every write path reuses it
+        self._insert_cypher = (
+            "UNWIND $rows AS r "
+            "CREATE (e:EnvironmentalData {id: r.id, temperature: r.temperature, "
+            "pressure: r.pressure, humidity: r.humidity, gas_resistance: r.gas_resistance}) "
+            "CREATE (t:Timestamp {value: r.ts, year: r.year, month: r.month, "
+            "day: r.day, hour: r.hour, minute: r.minute}) "
+            "CREATE (e)-[:MEASURED_AT]->(t)"
+        )
+
+        # Initialize Neo4j connection: one driver with a connection pool;
+        # the session is opened lazily inside the event loop by run()
+        self._driver = AsyncGraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_password))
+        self._session = None
         logger.info("Connected to Neo4j database")
-        
+
         # Initialize sensor
         self._init_sensor()
     
@@ -102,18 +123,23 @@ class SensorCollector:
         '''
         try:
             if self.sensor.get_sensor_data():
+                now = datetime.datetime.now()
                 data = {
                     "temperature": round(self.sensor.data.temperature, 2),  # °C
                     "pressure": round(self.sensor.data.pressure, 2),  # hPa
                     "humidity": round(self.sensor.data.humidity, 2),  # %RH
-                    "timestamp": datetime.datetime.now().isoformat()
+                    "timestamp": now.isoformat(),
+                    "_dt": now  # Parsed datetime, kept so writers never re-parse
                 }
                 
                 # Add gas resistance if available (air quality indicator)
                 if self.sensor.data.heat_stable:
                     data["gas_resistance"] = self.sensor.data.gas_resistance  # Ohms
                 
-                logger.debug(f"Sensor data: {data}")
+                # Guard so the message (dict repr included) is only built
+                # when DEBUG logging is actually enabled
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Sensor data: %s", data)
                 return data
             else:
                 logger.warning("Failed to get sensor data")
@@ -122,88 +148,155 @@ class SensorCollector:
             logger.error(f"Error reading sensor: {e}")
             return {}
     
-    def store_in_neo4j(self, data: Dict[str, Any]) -> Optional[str]:
+    async def _write_rows(self, rows) -> None:
         '''
-        Store sensor data in Neo4j graph database
-        
+        Run the insert query for the given parameter rows in one managed
+        write transaction on the pooled session
+        '''
+        if self._session is None:
+            self._session = self._driver.session(database="neo4j")
+
+        async def work(tx):
+            result = await tx.run(self._insert_cypher, rows=rows)
+            await result.consume()
+
+        await self._session.execute_write(work)
+
+    async def close(self) -> None:
+        '''
+        Close the Neo4j session and driver
+        '''
+        if self._session is not None:
+            await self._session.close()
+        await self._driver.close()
+
+    @staticmethod
+    def _row_from_data(data: Dict[str, Any]) -> Dict[str, Any]:
+        '''
+        Convert a sensor reading into a parameter row for the insert query
+        '''
+        dt = data.get("_dt") or datetime.datetime.fromisoformat(data["timestamp"])
+        return {
+            "id": str(uuid.uuid4()),
+            "temperature": data["temperature"],
+            "pressure": data["pressure"],
+            "humidity": data["humidity"],
+            "gas_resistance": data.get("gas_resistance"),
+            "ts": data["timestamp"],
+            "year": dt.year,
+            "month": dt.month,
+            "day": dt.day,
+            "hour": dt.hour,
+            "minute": dt.minute
+        }
+
+    async def store_in_neo4j(self, data: Dict[str, Any]) -> Optional[str]:
+        '''
+        Store a single sensor reading in Neo4j immediately
+
+        Runs the precompiled parameterized insert query for one row; the
+        batched flush_batch path is preferred for continuous collection.
+
         Args:
             data: Sensor data dictionary
-            
+
         Returns:
             ID of the created data node or None if failed
         '''
         if not data:
             return None
-        
+
         try:
-            # Create unique ID for this reading
-            reading_id = str(uuid.uuid4())
-            
-            # Create timestamp node
-            timestamp_node = Node("Timestamp",
-                                 value=data["timestamp"],
-                                 year=datetime.datetime.fromisoformat(data["timestamp"]).year,
-                                 month=datetime.datetime.fromisoformat(data["timestamp"]).month,
-                                 day=datetime.datetime.fromisoformat(data["timestamp"]).day,
-                                 hour=datetime.datetime.fromisoformat(data["timestamp"]).hour,
-                                 minute=datetime.datetime.fromisoformat(data["timestamp"]).minute)
-            
-            # Create environmental data node
-            env_data = dict(data)
-            env_data.pop("timestamp", None)  # Remove timestamp from properties
-            env_data["id"] = reading_id
-            
-            env_node = Node("EnvironmentalData", **env_data)
-            
-            # Create relationship
-            measured_at = Relationship(env_node, "MEASURED_AT", timestamp_node)
-            
-            # Create transaction and commit
-            tx = self.graph.begin()
-            tx.create(env_node)
-            tx.create(timestamp_node)
-            tx.create(measured_at)
-            tx.commit()
-            
-            logger.info(f"Stored sensor reading {reading_id} in Neo4j")
-            return reading_id
+            row = self._row_from_data(data)
+            await self._write_rows([row])
+            logger.info(f"Stored sensor reading {row['id']} in Neo4j")
+            return row["id"]
         except Exception as e:
             logger.error(f"Failed to store in Neo4j: {e}")
             return None
-    
-    def run(self, duration: Optional[int] = None) -> None:
+
+    async def flush_batch(self) -> int:
+        '''
+        Write all buffered readings to Neo4j in a single transaction
+
+        Returns:
+            Number of readings written
+        '''
+        if not self._buffer:
+            return 0
+
+        # Pre-compute the per-row properties once in Python, then let a single
+        # UNWIND query create all nodes and relationships in one round-trip
+        rows = [self._row_from_data(data) for data in self._buffer]
+
+        try:
+            await self._write_rows(rows)
+            written = len(rows)
+            self._buffer.clear()
+            logger.info(f"Stored batch of {written} readings in Neo4j")
+            return written
+        except Exception as e:
+            logger.error(f"Failed to store batch in Neo4j: {e}")
+            return 0
+
+    async def _write_task(self, queue: "asyncio.Queue") -> None:
+        '''
+        Writer task: drain readings from the queue into Neo4j batches
+
+        Runs concurrently with sampling so a slow write never delays the
+        next sensor read. A None item signals shutdown.
+        '''
+        while True:
+            data = await queue.get()
+            if data is None:
+                break
+
+            self._buffer.append(data)
+            if len(self._buffer) >= self._batch_size:
+                await self.flush_batch()
+
+    async def run(self, duration: Optional[int] = None) -> None:
         '''
         Run the data collection loop
-        
+
+        Readings are sampled on the collection interval and handed to a
+        background writer task over a queue, overlapping Neo4j I/O with
+        the wait for the next sample.
+
         Args:
             duration: Optional duration in seconds to run, or None for indefinite
         '''
-        start_time = time.time()
+        self._session = self._driver.session(database="neo4j")
+        queue: asyncio.Queue = asyncio.Queue()
+        writer = asyncio.create_task(self._write_task(queue))
+
+        start_time = time.monotonic()
         count = 0
-        
+
         try:
             while True:
                 # Check if we've reached the duration
-                if duration and (time.time() - start_time) > duration:
+                if duration and (time.monotonic() - start_time) > duration:
                     logger.info(f"Reached collection duration of {duration} seconds")
                     break
-                
-                # Read sensor data
+
+                # Read sensor data and hand it to the writer task
                 data = self.read_sensor()
-                
-                # Store in Neo4j
                 if data:
-                    reading_id = self.store_in_neo4j(data)
-                    if reading_id:
-                        count += 1
-                        if count % 10 == 0:
-                            logger.info(f"Collected {count} readings so far")
-                
+                    queue.put_nowait(data)
+                    count += 1
+                    if count % 10 == 0:
+                        logger.info(f"Collected {count} readings so far")
+
                 # Wait for next collection interval
-                time.sleep(self.collection_interval)
+                await asyncio.sleep(self.collection_interval)
         except KeyboardInterrupt:
             logger.info("Collection stopped by user")
         finally:
+            # Let the writer finish, then write any remaining readings
+            queue.put_nowait(None)
+            await writer
+            await self.flush_batch()
             logger.info(f"Collection complete. Collected {count} readings.")
 
 def main():
@@ -215,6 +308,7 @@ def main():
     parser.add_argument("--neo4j-user", default="neo4j", help="Neo4j username")
     parser.add_argument("--neo4j-password", default="password", help="Neo4j password")
     parser.add_argument("--interval", type=int, default=10, help="Collection interval in seconds")
+    parser.add_argument("--batch-size", type=int, default=50, help="Readings per Neo4j write batch")
     parser.add_argument("--duration", type=int, help="Collection duration in seconds (optional)")
     parser.add_argument("--mock", action="store_true", help="Use simulated sensor data")
     
@@ -225,10 +319,20 @@ def main():
         neo4j_user=args.neo4j_user,
         neo4j_password=args.neo4j_password,
         collection_interval=args.interval,
+        batch_size=args.batch_size,
         mock=args.mock
     )
     
-    collector.run(args.duration)
+    async def _run():
+        try:
+            await collector.run(args.duration)
+        finally:
+            await collector.close()
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        logger.info("Collection stopped by user")
 
 if __name__ == "__main__":
     main()
@@ -5,11 +5,28 @@ BME680 Sensor Simulator
 Provides a simulated BME680 sensor for testing without hardware
 '''
 
-import random
 import time
 import math
 from typing import Dict, Any
 
+import numpy as np
+
+# Numba compiles the simulation step to native code when available
+try:
+    from numba import njit
+    numba_available = True
+except ImportError:
+    # For running without numba: @njit becomes a no-op decorator
+    numba_available = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
 # Constants for simulated sensor
 I2C_ADDR_PRIMARY = 0x76
 I2C_ADDR_SECONDARY = 0x77
@@ -36,10 +53,22 @@ FILTER_SIZE_127 = 7
 ENABLE_GAS_MEAS = 1
 DISABLE_GAS_MEAS = 0
 
+# Angular frequency of the daily cycle (radians per hour)
+_W = 2.0 * math.pi / 24.0
+
+# Trend vector layout and clamp bounds (temperature, pressure, humidity)
+TREND_T, TREND_P, TREND_H = 0, 1, 2
+_TREND_LO = np.array([-2.0, -10.0, -20.0])
+_TREND_HI = np.array([2.0, 10.0, 20.0])
+
 class SensorData:
     '''
     Class to hold simulated sensor data
     '''
+    # Slot storage: five attribute writes per tick land in a C array
+    # instead of an instance __dict__
+    __slots__ = ('temperature', 'pressure', 'humidity', 'gas_resistance', 'heat_stable')
+
     def __init__(self):
         self.temperature = 25.0  # Initial temperature °C
         self.pressure = 1013.25  # Initial pressure hPa
@@ -47,10 +76,66 @@ class SensorData:
         self.gas_resistance = 50000.0  # Initial gas resistance Ohms
         self.heat_stable = False
 
+@njit(cache=True, fastmath=True)
+def _bme_step(tod_hours, elapsed, trends, gas_enabled, gas_resistance, r):
+    '''
+    One numeric simulation step for the BME680
+
+    Pure math kernel (compiled by numba when available): takes the time of
+    day, the trend vector (updated in place) and a vector of 7 uniform
+    random draws, and returns the new readings.
+    '''
+    # Daily cycle shared by temperature and humidity: temperature peaks at
+    # 14:00 (2PM) and bottoms at 2:00 (2AM); humidity runs anti-phase with
+    # the same waveform, so one sin evaluation covers both
+    s = math.sin((tod_hours - 8.0) * _W)
+    daily_temp_cycle = 5.0 * s
+
+    # Drift all three trends (pressure inversely coupled to the temperature
+    # trend), then clamp them with a single vector clip
+    deltas = np.empty(3)
+    deltas[TREND_T] = (r[0] - 0.5) * 0.1 * elapsed
+    deltas[TREND_P] = -(trends[TREND_T] * 0.5) + (r[2] - 0.5) * 0.5 * elapsed
+    deltas[TREND_H] = (r[4] - 0.5) * 0.5 * elapsed
+    trends += deltas
+    trends[:] = np.minimum(_TREND_HI, np.maximum(_TREND_LO, trends))
+
+    temperature = 25.0 + trends[TREND_T] + daily_temp_cycle + (r[1] - 0.5) * 0.3
+
+    # Simulate pressure variations (typically 950-1050 hPa)
+    pressure = 1013.25 + trends[TREND_P] + (r[3] - 0.5) * 0.5
+
+    # Simulate humidity (tends to be higher at night, lower during hottest part of day)
+    # Humidity is anti-correlated with temperature in many environments
+    humidity_cycle = -10.0 * s
+    humidity = max(0.0, min(100.0, 50.0 + trends[TREND_H] + humidity_cycle + (r[5] - 0.5) * 2.0))
+
+    # Simulate gas resistance (air quality)
+    # Lower values typically indicate poorer air quality
+    if gas_enabled:
+        # Gas resistance tends to be higher when humidity is lower
+        humidity_factor = 1.0 - (humidity / 150.0)
+
+        # Air quality tends to be worse during rush hours (6-10AM, 4-8PM)
+        rush = (abs(tod_hours - 8.0) < 2.0) | (abs(tod_hours - 18.0) < 2.0)
+        rush_hour_factor = 0.7 if rush else 1.0
+
+        base_resistance = 50000.0 * humidity_factor * rush_hour_factor
+        gas_resistance = max(5000.0, base_resistance + (r[6] - 0.3) * 10000.0)
+
+    return temperature, pressure, humidity, gas_resistance
+
 class BME680Simulator:
     '''
     Simulates a BME680 environmental sensor with realistic data patterns
     '''
+    __slots__ = ('i2c_addr', 'data',
+                 'humidity_oversample', 'pressure_oversample', 'temperature_oversample',
+                 'filter_size', 'gas_status',
+                 'gas_heater_temp', 'gas_heater_duration', 'gas_heater_profile',
+                 '_last_update_ns', '_trends',
+                 '_time_of_day_hours', '_rng', '_pool', '_pool_i')
+
     def __init__(self, i2c_addr=I2C_ADDR_PRIMARY):
         '''
         Initialize simulated sensor
@@ -71,11 +156,16 @@ class BME680Simulator:
         self.gas_heater_duration = 0
         self.gas_heater_profile = 0
         
-        # Internal state
-        self._last_update = time.time()
-        self._temp_trend = 0.0
-        self._pressure_trend = 0.0
-        self._humidity_trend = 0.0
+        # Random pool: one large batched draw amortizes the generator cost
+        # over thousands of ticks; _draw slices it and refills on exhaustion
+        self._rng = np.random.default_rng()
+        self._pool = self._rng.random(1 << 16)
+        self._pool_i = 0
+
+        # Internal state (monotonic integer nanoseconds for elapsed time:
+        # immune to NTP adjustments, integer subtraction on the hot path)
+        self._last_update_ns = time.monotonic_ns()
+        self._trends = np.zeros(3)  # Indexed by TREND_T / TREND_P / TREND_H
         self._time_of_day_hours = (time.time() % 86400) / 3600  # 0-24 hours
     
     def set_humidity_oversample(self, value):
@@ -101,69 +191,54 @@ class BME680Simulator:
     
     def select_gas_heater_profile(self, value):
         self.gas_heater_profile = value
-        
+
+    def _draw(self, k):
+        '''
+        Take k uniform [0, 1) draws from the prefilled random pool,
+        refilling it from the generator when exhausted
+        '''
+        i = self._pool_i
+        if i + k > len(self._pool):
+            self._pool = self._rng.random(len(self._pool))
+            i = 0
+        self._pool_i = i + k
+        return self._pool[i:i + k]
+
+
     def get_sensor_data(self):
         '''
         Simulate reading from the sensor with realistic variations
+
+        The numeric work happens in the module-level _bme_step kernel;
+        this method only manages timing and sensor state.
         '''
-        now = time.time()
-        elapsed = now - self._last_update
-        self._last_update = now
-        
+        now_ns = time.monotonic_ns()
+        elapsed = (now_ns - self._last_update_ns) * 1e-9
+        self._last_update_ns = now_ns
+
         # Update time of day (0-24 hours)
         self._time_of_day_hours = (self._time_of_day_hours + (elapsed / 3600)) % 24
-        
-        # Simulate temperature with daily cycle and random variations
-        # Temperature peaks at 14:00 (2PM) and bottoms at 2:00 (2AM)
-        daily_temp_cycle = 5.0 * math.sin(((self._time_of_day_hours - 8) / 24) * 2 * math.pi)
-        
-        # Slowly change trend over time
-        self._temp_trend = max(-2.0, min(2.0, self._temp_trend + (random.random() - 0.5) * 0.1 * elapsed))
-        
-        # Update temperature
-        base_temp = 25.0 + self._temp_trend + daily_temp_cycle
-        noise = (random.random() - 0.5) * 0.3
-        self.data.temperature = round(base_temp + noise, 2)
-        
-        # Simulate pressure variations (typically 950-1050 hPa)
-        # Pressure often inversely correlates with temperature changes
-        self._pressure_trend = max(-10.0, min(10.0, self._pressure_trend - (self._temp_trend * 0.5) + (random.random() - 0.5) * 0.5 * elapsed))
-        base_pressure = 1013.25 + self._pressure_trend
-        pressure_noise = (random.random() - 0.5) * 0.5
-        self.data.pressure = round(base_pressure + pressure_noise, 2)
-        
-        # Simulate humidity (tends to be higher at night, lower during hottest part of day)
-        # Humidity is anti-correlated with temperature in many environments
-        humidity_cycle = -10.0 * math.sin(((self._time_of_day_hours - 8) / 24) * 2 * math.pi)
-        self._humidity_trend = max(-20.0, min(20.0, self._humidity_trend + (random.random() - 0.5) * 0.5 * elapsed))
-        base_humidity = 50.0 + self._humidity_trend + humidity_cycle
-        humidity_noise = (random.random() - 0.5) * 2.0
-        self.data.humidity = round(max(0.0, min(100.0, base_humidity + humidity_noise)), 2)
-        
-        # Simulate gas resistance (air quality)
-        # Lower values typically indicate poorer air quality
-        # Affected by humidity and time of day (traffic patterns, etc)
-        if self.gas_status == ENABLE_GAS_MEAS:
-            # Gas resistance tends to be higher when humidity is lower
-            humidity_factor = 1.0 - (self.data.humidity / 150.0)  # Higher humidity, lower resistance
-            
-            # Air quality tends to be worse during rush hours
-            rush_hour_factor = 1.0
-            morning_rush = abs(self._time_of_day_hours - 8.0) < 2.0  # 6AM-10AM
-            evening_rush = abs(self._time_of_day_hours - 18.0) < 2.0  # 4PM-8PM
-            if morning_rush or evening_rush:
-                rush_hour_factor = 0.7  # Reduce resistance during rush hours
-            
-            base_resistance = 50000.0 * humidity_factor * rush_hour_factor
-            resistance_noise = (random.random() - 0.3) * 10000.0
-            self.data.gas_resistance = max(5000.0, base_resistance + resistance_noise)
-            
+
+        # One pool slice covers all the noise terms the kernel needs
+        gas_enabled = self.gas_status == ENABLE_GAS_MEAS
+        r = self._draw(7)
+        temperature, pressure, humidity, gas_resistance = _bme_step(
+            self._time_of_day_hours, elapsed, self._trends,
+            gas_enabled, self.data.gas_resistance, r)
+
+        # Full precision here; consumers that display values round at their
+        # own serialization boundary (e.g. sensor_collector.read_sensor)
+        self.data.temperature = temperature
+        self.data.pressure = pressure
+        self.data.humidity = humidity
+
+        if gas_enabled:
+            self.data.gas_resistance = gas_resistance
+
             # Heat stability depends on heater settings
-            if self.gas_heater_temp > 200 and self.gas_heater_duration > 100:
-                self.data.heat_stable = True
-            else:
-                self.data.heat_stable = False
+            self.data.heat_stable = (self.gas_heater_temp > 200 and
+                                     self.gas_heater_duration > 100)
         else:
             self.data.heat_stable = False
-        
+
         return True
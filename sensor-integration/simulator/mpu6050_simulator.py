@@ -7,239 +7,332 @@ Provides a simulated MPU6050 sensor for testing without hardware
 
 import time
 import math
-import random
-numpy_available = False
+
+import numpy as np
+
+# Numba compiles the simulation kernels to native code when available
 try:
-    import numpy as np
-    numpy_available = True
+    from numba import njit, vectorize
+    numba_available = True
 except ImportError:
-    pass
+    # For running without numba: @njit becomes a no-op decorator
+    numba_available = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+if numba_available:
+    @vectorize(['f4(f4,f4,f4)', 'f8(f8,f8,f8)'], target='parallel', fastmath=True)
+    def accel_mag(x, y, z):
+        '''
+        Acceleration magnitude sqrt(x^2 + y^2 + z^2), elementwise over batches
+        '''
+        return math.sqrt(x * x + y * y + z * z)
+else:
+    # Plain numpy fallback with the same call signature
+    def accel_mag(x, y, z):
+        '''
+        Acceleration magnitude sqrt(x^2 + y^2 + z^2), elementwise over batches
+        '''
+        return np.sqrt(x * x + y * y + z * z)
+
+# State vector layout: accel x/y/z, gyro x/y/z, temperature
+AX, AY, AZ, GX, GY, GZ, TEMP = 0, 1, 2, 3, 4, 5, 6
+
+# Scenario bookkeeping vector layout: simulated clock (s), active scenario,
+# scenario start time (s), scenario duration (s)
+CLOCK, SCEN, START, DUR = 0, 1, 2, 3
+
+# Scenario codes
+SCEN_NORMAL, SCEN_FALL, SCEN_POTHOLE = 0.0, 1.0, 2.0
+
+# Uniform random draws consumed per simulation step (one row of the pool)
+_DRAWS_PER_STEP = 12
+
+@njit(cache=True, fastmath=True)
+def _step_normal(state, r):
+    '''
+    Simulate normal riding conditions with small vibrations
+    '''
+    # Small random vibrations
+    state[AX] = -0.5 + r[1]
+    state[AY] = -0.5 + r[2]
+    state[AZ] = 9.5 + r[3] * 0.6
+
+    # Small random rotations
+    state[GX] = -0.2 + r[4] * 0.4
+    state[GY] = -0.2 + r[5] * 0.4
+    state[GZ] = -0.1 + r[6] * 0.2
+
+    # Occasionally simulate turns (changes in gyro_z)
+    if r[7] < 0.05:  # 5% chance per reading
+        turn_direction = 1.0 if r[8] < 0.5 else -1.0
+        state[GZ] = turn_direction * (0.5 + r[9])
+
+@njit(cache=True, fastmath=True)
+def _step_fall(state, progress, r):
+    '''
+    Simulate a fall event
+
+    Args:
+        state: Simulation state vector, updated in place
+        progress: Value from 0 to 1 indicating progress through the event
+        r: Uniform random draws for this step
+    '''
+    if progress < 0.1:
+        # Initial lean (bike starting to tip)
+        lean_angle = progress * 10 * math.pi / 180  # Convert to radians
+        state[AX] = 9.8 * math.sin(lean_angle)
+        state[AZ] = 9.8 * math.cos(lean_angle)
+        state[GX] = 0.5 + r[1] * 0.5  # Rotation rate increasing
+
+    elif progress < 0.3:
+        # Free fall phase (near-zero acceleration, high rotation rate)
+        state[AX] = -1.0 + r[1] * 2.0
+        state[AY] = -1.0 + r[2] * 2.0
+        state[AZ] = -1.0 + r[3] * 2.0
+        state[GX] = 2.0 + r[4] * 3.0
+        state[GY] = -2.0 + r[5] * 4.0
+
+    elif progress < 0.4:
+        # Impact: high acceleration on the impact axis
+        if r[1] < 0.5:  # Side impact
+            state[AX] = 25.0 + r[2] * 10.0
+            state[AY] = -5.0 + r[3] * 10.0
+        else:  # Front impact
+            state[AX] = -5.0 + r[2] * 10.0
+            state[AY] = 25.0 + r[3] * 10.0
+        state[AZ] = 5.0 + r[4] * 5.0
+
+        # Chaotic rotation during impact
+        state[GX] = -10.0 + r[5] * 20.0
+        state[GY] = -10.0 + r[6] * 20.0
+        state[GZ] = -10.0 + r[7] * 20.0
+
+    else:
+        # Stationary after fall
+        fall_angle = (60.0 + r[1] * 30.0) * math.pi / 180  # Final resting angle
+        state[AX] = 9.8 * math.sin(fall_angle)  # Gravity component on x-axis
+        state[AY] = -1.0 + r[2] * 2.0
+        state[AZ] = 9.8 * math.cos(fall_angle)  # Reduced gravity on z-axis
+
+        # Very little rotation after fall
+        state[GX] = -0.1 + r[3] * 0.2
+        state[GY] = -0.1 + r[4] * 0.2
+        state[GZ] = -0.1 + r[5] * 0.2
+
+@njit(cache=True, fastmath=True)
+def _step_pothole(state, progress, r):
+    '''
+    Simulate hitting a pothole
+
+    Args:
+        state: Simulation state vector, updated in place
+        progress: Value from 0 to 1 indicating progress through the event
+        r: Uniform random draws for this step
+    '''
+    if progress < 0.3:
+        # Initial drop (front wheel hitting pothole)
+        state[AZ] = -9.8 - (5.0 + r[1] * 10.0)  # Strong negative z acceleration
+        state[AX] = -2.0 + r[2] * 4.0  # Small x component
+        state[AY] = -2.0 + r[3] * 4.0  # Small y component
+
+        # Rotation around x-axis (pitch) as front wheel drops
+        state[GX] = 2.0 + r[4] * 2.0
+        state[GY] = -0.5 + r[5]
+        state[GZ] = -0.5 + r[6]
+
+    elif progress < 0.7:
+        # Impact as wheel exits pothole (strong positive z acceleration)
+        state[AZ] = 9.8 + (5.0 + r[1] * 10.0)
+        state[AX] = -3.0 + r[2] * 6.0  # Possible x component
+        state[AY] = -3.0 + r[3] * 6.0  # Possible y component
+
+        # Reverse rotation around x-axis (pitch) as wheel comes up
+        state[GX] = -3.0 + r[4] * 2.0
+        state[GY] = -0.5 + r[5]
+        state[GZ] = -0.5 + r[6]
+
+    else:
+        # Settling after pothole (oscillations damping out)
+        damping = (1.0 - progress) * 2
+        state[AZ] = 9.8 + (-2.0 + r[1] * 4.0) * damping
+        state[AX] = (-1.0 + r[2] * 2.0) * damping
+        state[AY] = (-1.0 + r[3] * 2.0) * damping
+
+        # Decreasing oscillations in rotation
+        state[GX] = (-1.0 + r[4] * 2.0) * damping
+        state[GY] = (-0.5 + r[5]) * damping
+        state[GZ] = (-0.5 + r[6]) * damping
+
+@njit(cache=True, fastmath=True)
+def _mpu_batch(state, sched, out, dt, r):
+    '''
+    Jitted driver loop: advance the simulation out.shape[0] steps of dt
+    seconds each, filling the preallocated output array
+
+    Args:
+        state: Simulation state vector, updated in place
+        sched: Scenario bookkeeping vector, updated in place
+        out: (n, 7) float32 output array (accel x/y/z, gyro x/y/z, temp)
+        dt: Simulated seconds per step
+        r: (n, _DRAWS_PER_STEP) uniform random draws
+    '''
+    n = out.shape[0]
+    for i in range(n):
+        row = r[i]
+        sched[CLOCK] += dt
+        now = sched[CLOCK]
+
+        # Update temperature with small random drift, kept within bounds
+        state[TEMP] = min(45.0, max(15.0, state[TEMP] + (row[0] - 0.5) * 0.1 * dt))
+
+        # Check if we should be in a special event scenario
+        if sched[SCEN] != SCEN_NORMAL and now >= sched[START]:
+            # Calculate progress through the event
+            progress = min(1.0, (now - sched[START]) / sched[DUR])
+
+            if sched[SCEN] == SCEN_FALL:
+                _step_fall(state, progress, row)
+            else:
+                _step_pothole(state, progress, row)
+
+            # Check if the event is complete; if so, schedule the next one
+            if progress >= 1.0:
+                sched[START] = now + 20.0 + row[10] * 40.0  # 20-60s out
+                if row[11] < 0.3:
+                    sched[SCEN] = SCEN_FALL
+                    sched[DUR] = 2.0  # Falls last about 2 seconds
+                else:
+                    sched[SCEN] = SCEN_POTHOLE
+                    sched[DUR] = 0.5  # Potholes last about 0.5 seconds
+        else:
+            # Normal riding simulation
+            _step_normal(state, row)
+
+        for j in range(7):
+            out[i, j] = state[j]
 
 class MPU6050Simulator:
     '''
-    Simulates an MPU6050 accelerometer and gyroscope with realistic data patterns
-    including synthetic fall and pothole events
+    Simulates an MPU6050 accelerometer and gyroscope with realistic data
+    patterns including synthetic fall and pothole events
+
+    The simulation itself lives in module-level kernels operating on a
+    state vector, so whole batches of samples can be produced in one
+    compiled loop (produce_batch); the scalar property API wraps the same
+    kernels one step at a time.
     '''
+    __slots__ = ('_state', '_sched', '_rng', '_last_update_ns')
+
     def __init__(self):
         '''
         Initialize the simulated sensor
         '''
-        # Base acceleration values (gravity is primarily on z-axis when flat)
-        self._accel_x = 0.0
-        self._accel_y = 0.0
-        self._accel_z = 9.8  # Earth gravity in m/s^2
-        
-        # Base gyroscope values (zero when not rotating)
-        self._gyro_x = 0.0
-        self._gyro_y = 0.0
-        self._gyro_z = 0.0
-        
-        # Sensor temperature
-        self._temperature = 25.0
-        
-        # Simulation parameters
-        self._init_time = time.time()
-        self._last_update = self._init_time
-        self._scenario = "normal"  # normal, fall, pothole
-        self._scenario_start = 0
-        self._scenario_duration = 0
-        self._scenario_progress = 0
-        
-        # Schedule random events
-        self._schedule_next_event()
-    
-    def _schedule_next_event(self):
-        '''
-        Schedule the next simulation event (fall or pothole)
-        '''
-        # Events occur randomly every 20-60 seconds
-        next_event_time = random.uniform(20, 60)
-        self._scenario_start = time.time() + next_event_time
-        
-        # 30% chance of fall, 70% chance of pothole
-        event_type = random.random()
-        if event_type < 0.3:
-            self._scenario = "fall"
-            self._scenario_duration = 2.0  # Falls last about 2 seconds
+        # Base state: gravity primarily on z-axis when flat, no rotation
+        self._state = np.zeros(7)
+        self._state[AZ] = 9.8  # Earth gravity in m/s^2
+        self._state[TEMP] = 25.0
+
+        # Single random generator; kernels consume prefilled draw rows
+        self._rng = np.random.default_rng()
+
+        # Scenario bookkeeping: simulated clock plus the first scheduled
+        # event (falls 30% / potholes 70%, 20-60 seconds out)
+        self._sched = np.zeros(4)
+        r = self._rng.random(2)
+        self._sched[START] = 20.0 + r[0] * 40.0
+        if r[1] < 0.3:
+            self._sched[SCEN] = SCEN_FALL
+            self._sched[DUR] = 2.0
         else:
-            self._scenario = "pothole"
-            self._scenario_duration = 0.5  # Potholes last about 0.5 seconds
-            
-    def _update_normal_riding(self):
-        '''
-        Simulate normal riding conditions with small vibrations
-        '''
-        # Small random vibrations
-        self._accel_x = random.uniform(-0.5, 0.5)
-        self._accel_y = random.uniform(-0.5, 0.5)
-        self._accel_z = 9.8 + random.uniform(-0.3, 0.3)
-        
-        # Small random rotations
-        self._gyro_x = random.uniform(-0.2, 0.2)
-        self._gyro_y = random.uniform(-0.2, 0.2)
-        self._gyro_z = random.uniform(-0.1, 0.1)
-        
-        # Occasionally simulate turns (changes in gyro_z)
-        if random.random() < 0.05:  # 5% chance per reading
-            turn_direction = 1 if random.random() < 0.5 else -1
-            self._gyro_z = turn_direction * random.uniform(0.5, 1.5)
-            
-    def _update_fall(self, progress):
+            self._sched[SCEN] = SCEN_POTHOLE
+            self._sched[DUR] = 0.5
+
+        self._last_update_ns = time.monotonic_ns()
+
+    def produce_batch(self, n_samples, dt):
         '''
-        Simulate a fall event
-        
+        Produce a batch of samples in a single compiled loop
+
         Args:
-            progress: Value from 0 to 1 indicating progress through the event
+            n_samples: Number of simulation steps to run
+            dt: Simulated seconds between samples
+
+        Returns:
+            (n_samples, 7) float32 array with columns accel x/y/z (m/s^2),
+            gyro x/y/z (rad/s) and temperature (degrees Celsius)
         '''
-        if progress < 0.1:
-            # Initial lean (bike starting to tip)
-            lean_angle = progress * 10 * math.pi / 180  # Convert to radians
-            self._accel_x = 9.8 * math.sin(lean_angle)
-            self._accel_z = 9.8 * math.cos(lean_angle)
-            self._gyro_x = random.uniform(0.5, 1.0)  # Rotation rate increasing
-        
-        elif progress < 0.3:
-            # Free fall phase (near-zero acceleration)
-            self._accel_x = random.uniform(-1.0, 1.0)
-            self._accel_y = random.uniform(-1.0, 1.0)
-            self._accel_z = random.uniform(-1.0, 1.0)
-            self._gyro_x = random.uniform(2.0, 5.0)  # High rotation rate
-            self._gyro_y = random.uniform(-2.0, 2.0)
-        
-        elif progress < 0.4:
-            # Impact
-            impact_direction = random.choice(["side", "front"])
-            if impact_direction == "side":
-                self._accel_x = random.uniform(25.0, 35.0)  # High side impact
-                self._accel_y = random.uniform(-5.0, 5.0)
-                self._accel_z = random.uniform(5.0, 10.0)
-            else:
-                self._accel_x = random.uniform(-5.0, 5.0)
-                self._accel_y = random.uniform(25.0, 35.0)  # High front impact
-                self._accel_z = random.uniform(5.0, 10.0)
-            
-            # Sudden stop in rotation
-            self._gyro_x = random.uniform(-10.0, 10.0)  # Chaotic rotation during impact
-            self._gyro_y = random.uniform(-10.0, 10.0)
-            self._gyro_z = random.uniform(-10.0, 10.0)
-        
-        else:
-            # Stationary after fall
-            fall_angle = random.uniform(60, 90) * math.pi / 180  # Final resting angle
-            self._accel_x = 9.8 * math.sin(fall_angle)  # Gravity component on x-axis
-            self._accel_y = random.uniform(-1.0, 1.0)
-            self._accel_z = 9.8 * math.cos(fall_angle)  # Reduced gravity on z-axis
-            
-            # Very little rotation after fall
-            self._gyro_x = random.uniform(-0.1, 0.1)
-            self._gyro_y = random.uniform(-0.1, 0.1)
-            self._gyro_z = random.uniform(-0.1, 0.1)
-    
-    def _update_pothole(self, progress):
+        out = np.empty((n_samples, 7), dtype=np.float32)
+        r = self._rng.random((n_samples, _DRAWS_PER_STEP))
+        _mpu_batch(self._state, self._sched, out, dt, r)
+        return out
+
+    def read_many(self, n, dt=0.01):
         '''
-        Simulate hitting a pothole
-        
+        Read a batch of acceleration samples plus their magnitudes
+
+        Advances the simulation n steps and computes all magnitudes in a
+        single vectorized accel_mag call — useful for fall/pothole
+        detectors that work on windows of samples.
+
         Args:
-            progress: Value from 0 to 1 indicating progress through the event
+            n: Number of samples to read
+            dt: Simulated seconds between samples
+
+        Returns:
+            Tuple of (samples, magnitudes): samples is an (n, 3) array of
+            x/y/z acceleration in m/s^2, magnitudes a length-n array
         '''
-        if progress < 0.3:
-            # Initial drop (front wheel hitting pothole)
-            self._accel_z = -9.8 - random.uniform(5.0, 15.0)  # Strong negative z acceleration
-            self._accel_x = random.uniform(-2.0, 2.0)  # Small x component
-            self._accel_y = random.uniform(-2.0, 2.0)  # Small y component
-            
-            # Rotation around x-axis (pitch) as front wheel drops
-            self._gyro_x = random.uniform(2.0, 4.0)
-            self._gyro_y = random.uniform(-0.5, 0.5)
-            self._gyro_z = random.uniform(-0.5, 0.5)
-        
-        elif progress < 0.7:
-            # Impact as wheel exits pothole (strong positive z acceleration)
-            self._accel_z = 9.8 + random.uniform(5.0, 15.0)  # Strong positive z acceleration
-            self._accel_x = random.uniform(-3.0, 3.0)  # Possible x component
-            self._accel_y = random.uniform(-3.0, 3.0)  # Possible y component
-            
-            # Reverse rotation around x-axis (pitch) as wheel comes up
-            self._gyro_x = random.uniform(-3.0, -1.0)
-            self._gyro_y = random.uniform(-0.5, 0.5)
-            self._gyro_z = random.uniform(-0.5, 0.5)
-        
-        else:
-            # Settling after pothole (oscillations damping out)
-            self._accel_z = 9.8 + random.uniform(-2.0, 2.0) * (1.0 - progress) * 2  # Oscillations damping
-            self._accel_x = random.uniform(-1.0, 1.0) * (1.0 - progress) * 2
-            self._accel_y = random.uniform(-1.0, 1.0) * (1.0 - progress) * 2
-            
-            # Decreasing oscillations in rotation
-            self._gyro_x = random.uniform(-1.0, 1.0) * (1.0 - progress) * 2
-            self._gyro_y = random.uniform(-0.5, 0.5) * (1.0 - progress) * 2
-            self._gyro_z = random.uniform(-0.5, 0.5) * (1.0 - progress) * 2
-    
+        samples = self.produce_batch(n, dt)[:, :3]
+        return samples, accel_mag(samples[:, 0], samples[:, 1], samples[:, 2])
+
     def _update_simulation(self):
         '''
-        Update the simulated sensor readings based on the current time and scenario
+        Advance the simulation one step using the real elapsed time
         '''
-        now = time.time()
-        elapsed = now - self._last_update
-        self._last_update = now
-        
-        # Update temperature with small random drift
-        self._temperature += random.uniform(-0.05, 0.05) * elapsed
-        self._temperature = min(45.0, max(15.0, self._temperature))  # Keep within reasonable bounds
-        
-        # Check if we should be in a special event scenario
-        if self._scenario != "normal" and now >= self._scenario_start:
-            # Calculate progress through the event
-            event_elapsed = now - self._scenario_start
-            progress = min(1.0, event_elapsed / self._scenario_duration)
-            self._scenario_progress = progress
-            
-            # Update based on the current scenario
-            if self._scenario == "fall":
-                self._update_fall(progress)
-            elif self._scenario == "pothole":
-                self._update_pothole(progress)
-            
-            # Check if the event is complete
-            if progress >= 1.0:
-                self._scenario = "normal"
-                self._schedule_next_event()
-        else:
-            # Normal riding simulation
-            self._update_normal_riding()
-    
+        now_ns = time.monotonic_ns()
+        elapsed = (now_ns - self._last_update_ns) * 1e-9
+        self._last_update_ns = now_ns
+        self.produce_batch(1, elapsed)
+
     @property
     def acceleration(self):
         '''
         Get the current acceleration values
-        
+
         Returns:
             Tuple of (x, y, z) acceleration in m/s^2
         '''
         self._update_simulation()
-        return (self._accel_x, self._accel_y, self._accel_z)
-    
+        return (self._state[AX], self._state[AY], self._state[AZ])
+
     @property
     def gyro(self):
         '''
         Get the current gyroscope values
-        
+
         Returns:
             Tuple of (x, y, z) rotation rates in rad/s
         '''
         # No need to update again, acceleration property already did
-        return (self._gyro_x, self._gyro_y, self._gyro_z)
-    
+        return (self._state[GX], self._state[GY], self._state[GZ])
+
     @property
     def temperature(self):
         '''
         Get the current temperature
-        
+
         Returns:
             Temperature in degrees Celsius
         '''
         # No need to update again, acceleration property already did
-        return self._temperature
+        return self._state[TEMP]
 
 # Simple test function
 def test_simulator():
@@ -247,26 +340,23 @@ def test_simulator():
     Test the simulator by printing values for a few seconds
     '''
     sensor = MPU6050Simulator()
-    
+
     print("Testing MPU6050 simulator for 10 seconds...")
     start_time = time.time()
-    
+
     while time.time() - start_time < 10:
         accel = sensor.acceleration
         gyro = sensor.gyro
         temp = sensor.temperature
-        
+
         # Calculate magnitude of acceleration
-        if numpy_available:
-            accel_mag = np.sqrt(accel[0]**2 + accel[1]**2 + accel[2]**2)
-        else:
-            accel_mag = math.sqrt(accel[0]**2 + accel[1]**2 + accel[2]**2)
-        
-        print(f"Accel (m/s²): X={accel[0]:.2f}, Y={accel[1]:.2f}, Z={accel[2]:.2f}, Mag={accel_mag:.2f}")
+        mag = math.sqrt(accel[0]**2 + accel[1]**2 + accel[2]**2)
+
+        print(f"Accel (m/s²): X={accel[0]:.2f}, Y={accel[1]:.2f}, Z={accel[2]:.2f}, Mag={mag:.2f}")
         print(f"Gyro (rad/s): X={gyro[0]:.2f}, Y={gyro[1]:.2f}, Z={gyro[2]:.2f}")
         print(f"Temp (°C): {temp:.2f}")
         print("---")
-        
+
         time.sleep(0.5)
 
 if __name__ == "__main__":